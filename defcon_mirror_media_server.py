@@ -1,20 +1,44 @@
 #!/usr/bin/env python3
 
 import os
+import re
+import html
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timezone
+from functools import partial
 from typing import List, Optional
 
 import click
 import scrapy
 from pydantic import BaseModel, HttpUrl
 from scrapy.crawler import CrawlerProcess
+from scrapy.pipelines.files import FilesPipeline
 import markdown
 import pypandoc
-from pdf2image import convert_from_path
+import pypdfium2 as pdfium
 from PIL import Image
 
 
+# Matches PDF links in the raw bytes of a directory listing, without building a selector tree; the
+# backreference lets a double-quoted href contain a single quote and vice versa
+_PDF_HREF_RE = re.compile(rb'href=(["\'])((?:(?!\1).)+?\.pdf)\1', re.IGNORECASE)
+
+# Resolution of the rendered first page, matching pdf2image's default
+_RENDER_DPI = 200
+
+# Markdown markup removed by _markdown_to_text, as (pattern, replacement) pairs
+_MARKDOWN_MARKUP = [
+    (re.compile(r'!?\[([^\]]*)\]\([^)]*\)'), r'\1'),  # images and links keep their text
+    (re.compile(r'^#{1,6}\s+', re.MULTILINE), ''),  # heading markers
+    (re.compile(r'(\*\*?)(\S(?:.*?\S)?)\1'), r'\2'),  # emphasis and strong emphasis
+    (re.compile(r'`([^`]*)`'), r'\1'),  # inline code
+    (re.compile(r'\\([\\`*_{}\[\]()#+\-.!|<>~^$])'), r'\1'),  # backslash escapes
+]
+
+
 class FilterRule(BaseModel):
     """Represents a filter rule for content mirroring."""
     name: str
@@ -58,17 +82,19 @@ class DefconSpider(scrapy.Spider):
         self.output_dir = output_dir
 
     def parse(self, response):
-        """Parse the response and yield requests for PDF files."""
-        for pdf_link in response.css('a[href$=".pdf"]::attr(href)').getall():
-            yield scrapy.Request(url=response.urljoin(pdf_link), callback=self.save_pdf)
+        """Parse the response and yield items with the PDF file URLs."""
+        for match in _PDF_HREF_RE.finditer(response.body):
+            # Raw bytes skip the entity decoding a selector would do, e.g. &amp; in query strings
+            pdf_link = html.unescape(match.group(2).decode('utf-8', 'ignore'))
+            yield {'file_urls': [response.urljoin(pdf_link)]}
 
-    def save_pdf(self, response):
-        """Save the PDF file to the output directory."""
-        filename = response.url.split('/')[-1]
-        filepath = os.path.join(self.output_dir, filename)
-        with open(filepath, 'wb') as f:
-            f.write(response.body)
-        self.logger.info(f"Saved file {filename}")
+
+class MirrorFilesPipeline(FilesPipeline):
+    """Files pipeline that stores PDFs under their original filename."""
+
+    def file_path(self, request, response=None, info=None, *, item=None) -> str:
+        """Return the storage path of a PDF, relative to FILES_STORE."""
+        return request.url.split('/')[-1]
 
 
 def generate_manifest(config: MirrorConfig) -> None:
@@ -80,44 +106,129 @@ def generate_manifest(config: MirrorConfig) -> None:
     """
     manifest_path = os.path.join(config.output_directory, "manifest.json")
     with open(manifest_path, "w") as f:
-        f.write(config.json(indent=2))
+        f.write(config.model_dump_json(indent=2))
     click.echo(f"Manifest file generated at {manifest_path}")
 
 
+def _markdown_to_text(markdown_text: str) -> str:
+    """
+    Strip inline Markdown markup to get plain text.
+
+    Args:
+        markdown_text (str): Markdown produced by pandoc.
+
+    Returns:
+        str: The text without links, emphasis, code spans, heading markers or escapes.
+    """
+    for pattern, replacement in _MARKDOWN_MARKUP:
+        markdown_text = pattern.sub(replacement, markdown_text)
+    return markdown_text
+
+
+def _needs_rebuild(pdf_mtime: float, output_path: str) -> bool:
+    """
+    Check whether an output file is missing or older than the PDF it is generated from.
+
+    Args:
+        pdf_mtime (float): Modification time of the source PDF.
+        output_path (str): Path to the generated file.
+
+    Returns:
+        bool: True if the output has to be (re)generated, False otherwise.
+    """
+    try:
+        return os.stat(output_path).st_mtime < pdf_mtime
+    except FileNotFoundError:
+        return True
+
+
+def _process_one(pdf_path: str, pdf_mtime: float, opts: PostProcessingOptions) -> List[str]:
+    """
+    Post-process a single mirrored PDF. Runs inside a worker process.
+
+    Outputs that are newer than the PDF are left as they are.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        pdf_mtime (float): Modification time of the PDF file.
+        opts (PostProcessingOptions): The post-processing options to apply.
+
+    Returns:
+        List[str]: One message per generated output file.
+    """
+    base_path = os.path.splitext(pdf_path)[0]
+    md_path = f"{base_path}.md"
+    txt_path = f"{base_path}.txt"
+    png_path = f"{base_path}.png"
+    thumb_path = f"{base_path}_thumb.png"
+    messages = []
+
+    build_markdown = opts.to_markdown and _needs_rebuild(pdf_mtime, md_path)
+    build_text = opts.to_text and _needs_rebuild(pdf_mtime, txt_path)
+
+    if build_markdown or build_text:
+        # The text is always derived from the Markdown, so pandoc runs once and the text file is
+        # the same whether or not the Markdown is requested too
+        markdown_text = pypandoc.convert_file(pdf_path, 'md')
+
+    if build_markdown:
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write(markdown_text)
+        messages.append(f"Generated Markdown: {md_path}")
+
+    if build_text:
+        with open(txt_path, 'w', encoding='utf-8') as f:
+            f.write(_markdown_to_text(markdown_text))
+        messages.append(f"Generated Text: {txt_path}")
+
+    build_png = opts.to_png and _needs_rebuild(pdf_mtime, png_path)
+    build_thumbnail = opts.create_thumbnail and _needs_rebuild(pdf_mtime, thumb_path)
+    if build_png or build_thumbnail:
+        # Render the first page once, in memory, and derive both outputs from it
+        with ExitStack() as stack:
+            # Close the document, page, bitmap and image in reverse order even if rendering or saving fails
+            pdf = pdfium.PdfDocument(pdf_path)
+            stack.callback(pdf.close)
+            page = pdf[0]
+            stack.callback(page.close)
+            bitmap = page.render(scale=_RENDER_DPI / 72)
+            stack.callback(bitmap.close)
+            image = stack.enter_context(bitmap.to_pil())
+
+            if build_png:
+                image.save(png_path, 'PNG')
+                messages.append(f"Generated PNG: {png_path}")
+
+            if build_thumbnail:
+                with image.copy() as thumb:
+                    thumb.thumbnail((200, 200), Image.LANCZOS)
+                    thumb.save(thumb_path, 'PNG', optimize=True)
+                messages.append(f"Generated Thumbnail: {thumb_path}")
+
+    return messages
+
+
 def post_process_content(config: MirrorConfig) -> None:
     """
     Perform post-processing on mirrored content based on specified options.
+
+    PDFs are processed in parallel, one worker process per CPU, since each
+    conversion is dominated by pandoc and PDFium rendering work on a single file.
     
     Args:
         config (MirrorConfig): The configuration for the mirroring process.
     """
-    for filename in os.listdir(config.output_directory):
-        if filename.endswith(".pdf"):
-            pdf_path = os.path.join(config.output_directory, filename)
-            base_name = os.path.splitext(filename)[0]
-
-            if config.post_processing.to_markdown:
-                md_path = os.path.join(config.output_directory, f"{base_name}.md")
-                pypandoc.convert_file(pdf_path, 'md', outputfile=md_path)
-                click.echo(f"Generated Markdown: {md_path}")
-
-            if config.post_processing.to_text:
-                txt_path = os.path.join(config.output_directory, f"{base_name}.txt")
-                pypandoc.convert_file(pdf_path, 'plain', outputfile=txt_path)
-                click.echo(f"Generated Text: {txt_path}")
-
-            if config.post_processing.to_png:
-                png_path = os.path.join(config.output_directory, f"{base_name}.png")
-                images = convert_from_path(pdf_path)
-                images[0].save(png_path, 'PNG')
-                click.echo(f"Generated PNG: {png_path}")
-
-            if config.post_processing.create_thumbnail:
-                thumb_path = os.path.join(config.output_directory, f"{base_name}_thumb.png")
-                images = convert_from_path(pdf_path, first_page=1, last_page=1)
-                images[0].thumbnail((200, 200))
-                images[0].save(thumb_path, 'PNG')
-                click.echo(f"Generated Thumbnail: {thumb_path}")
+    with os.scandir(config.output_directory) as entries:
+        pdf_entries = [entry for entry in entries if entry.name.endswith(".pdf") and entry.is_file()]
+    pdf_paths = [entry.path for entry in pdf_entries]
+    pdf_mtimes = [entry.stat().st_mtime for entry in pdf_entries]
+
+    process_one = partial(_process_one, opts=config.post_processing)
+    # Spawned rather than forked workers, as forking after Scrapy's reactor and PDFium are loaded is unsafe
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn')) as executor:
+        for messages in executor.map(process_one, pdf_paths, pdf_mtimes, chunksize=4):
+            for message in messages:
+                click.echo(message)
 
 
 @click.command()
@@ -188,6 +299,10 @@ def defcon_mirror_media_server(
         'USER_AGENT': config.scrapy_options.user_agent,
         'DOWNLOAD_DELAY': config.scrapy_options.download_delay,
         'RANDOMIZE_DOWNLOAD_DELAY': config.scrapy_options.randomize_download_delay,
+        'ITEM_PIPELINES': {MirrorFilesPipeline: 1},
+        'FILES_STORE': mirror_dir,
+        # Files already in FILES_STORE are only fetched again once older than FILES_EXPIRES days
+        'FILES_EXPIRES': 0 if config.force_download else 90,
     })
 
     process.crawl(DefconSpider, url=url, output_dir=mirror_dir)
@@ -1,19 +1,23 @@
 import os
-import time
-from typing import Set, Optional
+import re
+import shelve
+from io import BytesIO
+from typing import IO, Dict, Set, Optional
 from urllib.parse import urlparse
-import hashlib
 
 import scrapy
 from scrapy.http import Response
 from scrapy.crawler import CrawlerProcess
+from scrapy.pipelines.files import FilesPipeline
 from pydantic import BaseModel, HttpUrl
 import click
+import xxhash
 
 class DefConConfig(BaseModel):
     """Configuration for the DEF CON spider."""
     output_dir: str
     max_file_size: int = 100 * 1024 * 1024  # 100MB
+    files_expires: int = 90  # days before an archived file is downloaded again
     allowed_domains: Set[str] = {"media.defcon.org"}
     start_url: HttpUrl = "https://media.defcon.org/"
 
@@ -22,6 +26,17 @@ class DefConSpider(scrapy.Spider):
 
     name = "comprehensive_defcon"
 
+    # XPath equivalent of the `a::attr(href)` CSS selector, used directly to skip CSS translation
+    _LINK_XPATH = '//a/@href'
+
+    _ALLOWED_PATHS = (
+        'DEF CON ', 'Conference Programs', 'DEF CON Music',
+        'DEF CON China', 'DEF CON NYE 2020'
+    )
+    # One compiled alternation matches all allowed paths in a single scan
+    _ALLOWED_PATH_RE = re.compile('|'.join(re.escape(allowed) for allowed in _ALLOWED_PATHS))
+    _ALLOWED_EXTENSIONS = ('.pdf', '.flac', '.opus', '.txt')
+
     def __init__(self, config: DefConConfig):
         """
         Initialize the DEF CON spider.
@@ -33,7 +48,10 @@ class DefConSpider(scrapy.Spider):
         self.config = config
         self.allowed_domains = list(config.allowed_domains)
         self.start_urls = [str(config.start_url)]
-        self.downloaded_files: Set[str] = set()
+        os.makedirs(config.output_dir, exist_ok=True)
+        # Persistent record of downloaded URLs and file contents, kept between runs
+        self.seen = shelve.open(os.path.join(config.output_dir, '.seen.db'))
+        self._meta_handles: Dict[str, IO[str]] = {}
 
     def parse(self, response: Response):
         """
@@ -45,7 +63,7 @@ class DefConSpider(scrapy.Spider):
         Yields:
             scrapy.Request: Requests for DEF CON event pages.
         """
-        for link in response.css('a::attr(href)').getall():
+        for link in response.xpath(self._LINK_XPATH).getall():
             if self.is_allowed_path(link):
                 yield response.follow(link, self.parse_event)
 
@@ -57,22 +75,60 @@ class DefConSpider(scrapy.Spider):
             response (Response): The response object from an event page.
 
         Yields:
-            scrapy.Request: Requests for file downloads or subdirectories.
+            scrapy.Request: HEAD requests for files, and requests for subdirectories.
         """
         event_name = self.get_event_name(response.url)
         if not event_name:
             return
 
-        for link in response.css('a::attr(href)').getall():
+        for link in response.xpath(self._LINK_XPATH).getall():
             if self.is_allowed_file(link):
                 yield scrapy.Request(
                     response.urljoin(link),
-                    callback=self.save_file,
+                    method='HEAD',
+                    callback=self.check_seen,
                     meta={'event_name': event_name}
                 )
             elif self.is_subdirectory(link):
                 yield response.follow(link, self.parse_event)
 
+    def check_seen(self, response: Response):
+        """
+        Queue a file for download unless the same version was downloaded by an earlier run.
+
+        Args:
+            response (Response): The response to a HEAD request for the file.
+
+        Yields:
+            dict: An item with the file URL for `DefConFilesPipeline` to download.
+        """
+        seen_key = self.get_seen_key(response)
+        if seen_key is not None and seen_key in self.seen:
+            self.logger.info(f"Skipping already downloaded file: {response.url}")
+            return
+
+        yield {
+            'file_urls': [response.url],
+            'event_name': response.meta['event_name'],
+            'seen_key': seen_key,
+        }
+
+    def get_seen_key(self, response: Response) -> Optional[str]:
+        """
+        Build the key identifying a version of a remote file from its HEAD response.
+
+        Args:
+            response (Response): The response to a HEAD request for the file.
+
+        Returns:
+            Optional[str]: The key, or None if the server sent neither Content-Length nor Last-Modified.
+        """
+        content_length = response.headers.get('Content-Length', b'').decode()
+        last_modified = response.headers.get('Last-Modified', b'').decode()
+        if not content_length and not last_modified:
+            return None
+        return f"url:{response.url}:{content_length}:{last_modified}"
+
     def is_allowed_path(self, path: str) -> bool:
         """
         Check if a path is allowed for crawling.
@@ -83,11 +139,7 @@ class DefConSpider(scrapy.Spider):
         Returns:
             bool: True if the path is allowed, False otherwise.
         """
-        allowed_paths = [
-            'DEF CON ', 'Conference Programs', 'DEF CON Music',
-            'DEF CON China', 'DEF CON NYE 2020'
-        ]
-        return any(allowed in path for allowed in allowed_paths)
+        return self._ALLOWED_PATH_RE.search(path) is not None
 
     def is_allowed_file(self, filename: str) -> bool:
         """
@@ -99,8 +151,7 @@ class DefConSpider(scrapy.Spider):
         Returns:
             bool: True if the file is allowed, False otherwise.
         """
-        allowed_extensions = ['.pdf', '.flac', '.opus', '.txt']
-        return any(filename.lower().endswith(ext) for ext in allowed_extensions)
+        return filename.lower().endswith(self._ALLOWED_EXTENSIONS)
 
     def is_subdirectory(self, path: str) -> bool:
         """
@@ -130,64 +181,115 @@ class DefConSpider(scrapy.Spider):
                 return part
         return None
 
-    def save_file(self, response: Response):
+    def update_metadata(self, event_name: str, filename: str):
         """
-        Save a file and update metadata.
+        Update the metadata file for an event.
+
+        The file is opened on first use and kept open, buffered, for the rest
+        of the crawl; it is flushed and closed in `closed`.
 
         Args:
-            response (Response): The response object containing the file.
+            event_name (str): The name of the event.
+            filename (str): The name of the file to add to metadata.
         """
-        event_name = response.meta['event_name']
-        filename = os.path.basename(urlparse(response.url).path)
-        event_dir = os.path.join(self.config.output_dir, event_name)
-        filepath = os.path.join(event_dir, filename)
+        handle = self._meta_handles.get(event_name)
+        if handle is None:
+            metadata_file = os.path.join(self.config.output_dir, f"{event_name}_metadata.txt")
+            handle = self._meta_handles[event_name] = open(metadata_file, 'a', buffering=1 << 16)
+        handle.write(f"{filename}\n")
 
-        if int(response.headers.get('Content-Length', 0)) > self.config.max_file_size:
-            self.logger.info(f"Skipping large file: {response.url}")
-            return
-
-        file_hash = hashlib.md5(response.body).hexdigest()
-        if file_hash in self.downloaded_files:
-            self.logger.info(f"Skipping duplicate file: {filename}")
-            return
+    def closed(self, reason: str):
+        """
+        Close the metadata files and create a master index when the spider is closed.
 
-        os.makedirs(event_dir, exist_ok=True)
-        with open(filepath, 'wb') as f:
-            f.write(response.body)
-        
-        self.downloaded_files.add(file_hash)
-        self.logger.info(f"Saved file {filename} to {event_dir}")
+        Args:
+            reason (str): The reason for closing the spider.
+        """
+        for handle in self._meta_handles.values():
+            handle.close()
+        self._meta_handles.clear()
+        self.seen.close()
+
+        with open(os.path.join(self.config.output_dir, 'master_index.txt'), 'w', buffering=1 << 20) as f:
+            with os.scandir(self.config.output_dir) as event_entries:
+                event_dirs = sorted((entry for entry in event_entries if entry.is_dir()), key=lambda entry: entry.name)
+            for event_dir in event_dirs:
+                with os.scandir(event_dir.path) as file_entries:
+                    filenames = sorted(entry.name for entry in file_entries)
+                # Write each event as one block rather than one write per line
+                f.write(f"{event_dir.name}:\n" + "".join(f"  {filename}\n" for filename in filenames) + "\n")
+
+class DefConFilesPipeline(FilesPipeline):
+    """Files pipeline that stores downloads as `<event_name>/<filename>` and skips duplicates."""
+
+    def file_path(self, request, response=None, info=None, *, item=None) -> str:
+        """
+        Get the storage path of a file, relative to FILES_STORE.
 
-        self.update_metadata(event_name, filename)
+        Args:
+            request (scrapy.Request): The download request for the file.
+            response (Optional[Response]): The downloaded response, if any.
+            info: Pipeline state for the running spider.
+            item (dict): The item the file belongs to.
 
-        time.sleep(1)  # Respectful delay
+        Returns:
+            str: The `<event_name>/<filename>` path of the file.
+        """
+        filename = os.path.basename(urlparse(request.url).path)
+        return os.path.join(item['event_name'], filename)
 
-    def update_metadata(self, event_name: str, filename: str):
+    def file_downloaded(self, response, request, info, *, item=None) -> str:
         """
-        Update the metadata file for an event.
+        Save a downloaded file unless identical content was already saved, and update metadata.
 
         Args:
-            event_name (str): The name of the event.
-            filename (str): The name of the file to add to metadata.
-        """
-        metadata_file = os.path.join(self.config.output_dir, f"{event_name}_metadata.txt")
-        with open(metadata_file, 'a') as f:
-            f.write(f"{filename}\n")
+            response (Response): The response object containing the file.
+            request (scrapy.Request): The download request for the file.
+            info: Pipeline state for the running spider.
+            item (dict): The item the file belongs to.
 
-    def closed(self, reason: str):
+        Returns:
+            str: The checksum of the file content.
+        """
+        spider = info.spider
+        path = self.file_path(request, response=response, info=info, item=item)
+        event_name, filename = os.path.split(path)
+
+        file_hash = xxhash.xxh3_128_hexdigest(response.body)
+        content_key = f"content:{file_hash}"
+        if content_key in spider.seen:
+            spider.logger.info(f"Skipping duplicate file: {filename}")
+        else:
+            self.store.persist_file(path, BytesIO(response.body), info)
+            spider.seen[content_key] = path
+            spider.logger.info(f"Saved file {filename} to {event_name}")
+            spider.update_metadata(event_name, filename)
+        return file_hash
+
+    def item_completed(self, results, item, info):
         """
-        Create a master index when the spider is closed.
+        Record the files of an item as seen and point duplicates at the stored copy.
+
+        Files still up to date in the store are recorded too, so later runs skip
+        them at the HEAD request rather than checking the store again.
 
         Args:
-            reason (str): The reason for closing the spider.
+            results (list): `(success, file_info)` pairs for the files of the item.
+            item (dict): The item the files belong to.
+            info: Pipeline state for the running spider.
+
+        Returns:
+            dict: The item with its `files` results.
         """
-        with open(os.path.join(self.config.output_dir, 'master_index.txt'), 'w') as f:
-            for event_dir in os.listdir(self.config.output_dir):
-                if os.path.isdir(os.path.join(self.config.output_dir, event_dir)):
-                    f.write(f"{event_dir}:\n")
-                    for file in os.listdir(os.path.join(self.config.output_dir, event_dir)):
-                        f.write(f"  {file}\n")
-                    f.write("\n")
+        spider = info.spider
+        for ok, file_info in results:
+            if not ok:
+                continue
+            # Duplicates are not saved under their own path, so report where the content is stored
+            file_info['path'] = spider.seen.get(f"content:{file_info['checksum']}", file_info['path'])
+            if item.get('seen_key') is not None:
+                spider.seen[item['seen_key']] = file_info['checksum']
+        return super().item_completed(results, item, info)
 
 @click.command()
 @click.option('--output-dir', default='defcon-comprehensive-archive', help='Directory to store the downloaded content')
@@ -204,7 +306,16 @@ def run_spider(output_dir: str, max_file_size: int):
     process = CrawlerProcess({
         'USER_AGENT': 'DEF CON Content Archiver (Educational/Research Use)',
         'ROBOTSTXT_OBEY': True,
-        'CONCURRENT_REQUESTS': 1,  # Be extra respectful
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        'DOWNLOAD_DELAY': 0.5,  # Respectful delay, applied by the scheduler
+        'RANDOMIZE_DOWNLOAD_DELAY': True,
+        'AUTOTHROTTLE_ENABLED': True,  # Back off automatically if the server slows down
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        'DOWNLOAD_MAXSIZE': config.max_file_size,
+        'ITEM_PIPELINES': {DefConFilesPipeline: 1},
+        'FILES_STORE': config.output_dir,
+        'FILES_EXPIRES': config.files_expires,
     })
 
     process.crawl(DefConSpider, config=config)
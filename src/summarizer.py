@@ -1,25 +1,98 @@
+import asyncio
+import functools
+import multiprocessing
 import os
+import re
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import tempfile
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import click
-from PyPDF2 import PdfReader
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
 from pydantic import BaseModel, ValidationError
 import logging
 import cohere
+import orjson
+import diskcache
+import xxhash
+
+try:
+    import pytesseract
+except ImportError:  # OCR of scanned PDFs is optional
+    pytesseract = None
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Debug mode: All intermediage data will be logged to logs/debug.log a related file given the source code
 global debug_mode 
 debug_mode = False
 
+# Default maximum number of summary requests sent to the provider at the same time
+MAX_CONCURRENT_REQUESTS = 8
+
+# Slots for provider requests actually in flight, shared by the request threads and the chunk requests a
+# long Cohere summary makes from inside one of them; resized to --concurrency by _process_talk_pdfs
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+# Maximum number of characters of PDF text included in a prompt; talk decks front-load their structure
+MAX_INPUT_CHARS = 16000
+
+# Longest prompt sent to Cohere in one call (~3k tokens, leaving room for the 300-token reply);
+# longer talks are summarized in overlapping chunks first
+COHERE_MAX_PROMPT_CHARS = 12000
+COHERE_CHUNK_CHARS = 4000
+COHERE_CHUNK_OVERLAP = 200
+COHERE_CHUNK_PROMPT = "Summarize the key points of this excerpt from a DEF CON talk:\n\n"
+
+# Number of entries kept per summary field when parsing free-form generated text
+MAX_MAIN_POINTS = 3
+MAX_TECHNICAL_DETAILS = 2
+MAX_IMPLICATIONS = 2
+
+# Lines mentioning an implication, matched without lowercasing each line first
+_IMPLICATION_RE = re.compile('implication', re.IGNORECASE)
+
+# Minimum number of pages handed to each process when one PDF's pages are extracted in parallel
+MIN_PAGES_PER_WORKER = 8
+
+# PDFs averaging fewer extracted characters per page than this, whose text-light pages all carry
+# images, are treated as scanned and OCRed
+MIN_TEXT_CHARS_PER_PAGE = 50
+
+# Resolution pages are rendered at for OCR
+OCR_DPI = 300
+
+# Ollama (connect, read) timeouts; generation on a local model can take minutes, so reads are unbounded
+OLLAMA_TIMEOUT = (10, None)
+
+# Shared HTTP session so provider requests reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Shared httpx client so Cohere requests reuse pooled TLS connections
+_HTTPX_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+    timeout=300.0,
+)
+
+# On-disk cache of generated summaries; opened by process_talk_pdfs in the output directory
+summary_cache: Optional[diskcache.Cache] = None
+
+# On-disk cache of extracted PDF content; opened by process_talk_pdfs in the output directory
+content_cache: Optional[diskcache.Cache] = None
+
 class TalkContent(BaseModel):
     text: str
     metadata: Dict[str, Any] = {}
+    # Set when the text layer was too thin and OCR was unavailable or failed, so the text is incomplete
+    needs_ocr: bool = False
 
 class Summary(BaseModel):
     title: str
@@ -32,98 +105,324 @@ def read_template(file_path: str) -> str:
     with open(file_path, 'r') as file:
         return file.read()
 
-def read_pdf(file_path: str) -> TalkContent:
-    """Extract text content from a PDF file with error handling."""
+def _extract_page_texts(pdf: pdfium.PdfDocument, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of an open PDF document."""
+    pages = []
+    for index in range(start, stop):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        pages.append(textpage.get_text_range())
+        textpage.close()
+        page.close()
+    return pages
+
+def _pdf_page_count(file_path: str) -> int:
+    """Return the number of pages in a PDF, or 0 if it cannot be opened."""
     try:
-        with open(file_path, 'rb') as file:
-            reader = PdfReader(file)
-            text = ""
-            metadata = {}
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            metadata = reader.metadata or {}
-        logger.debug(f"Successfully read PDF: {file_path}")
-        logger.debug(f"Extracted text length: {len(text)}")
-        logger.debug(f"Metadata: {metadata}")
-        return TalkContent(text=text, metadata=metadata)
+        pdf = pdfium.PdfDocument(file_path)
+    except Exception:  # read_pdf reports the error when it opens the file
+        return 0
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Open a PDF and extract the text of pages [start, stop); runs in a worker process."""
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return _extract_page_texts(pdf, start, stop)
+    finally:
+        pdf.close()
+
+def _text_light_pages_have_images(pdf: pdfium.PdfDocument, pages: List[str]) -> bool:
+    """Return True if every page with little text carries an image, as the pages of a scanned deck do."""
+    for index, page_text in enumerate(pages):
+        if len(page_text.strip()) >= MIN_TEXT_CHARS_PER_PAGE:
+            continue
+        page = pdf[index]
+        try:
+            if next(page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]), None) is None:
+                return False
+        finally:
+            page.close()
+    return True
+
+def _ocr_text(pdf: pdfium.PdfDocument, file_path: str) -> Optional[str]:
+    """Render every page of a PDF and OCR it with Tesseract; return None if OCR is unavailable."""
+    if pytesseract is None:
+        logger.warning(f"{file_path} has little or no text layer; install pytesseract to OCR it")
+        return None
+    pages = []
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            bitmap = page.render(scale=OCR_DPI / 72)
+            image = bitmap.to_pil()
+            try:
+                pages.append(pytesseract.image_to_string(image).strip())
+            finally:
+                image.close()
+                bitmap.close()
+                page.close()
+    except (pytesseract.TesseractError, OSError) as e:
+        logger.warning(f"OCR failed for {file_path}: {str(e)}")
+        return None
+    return "\n".join(pages)
+
+def read_pdf(file_path: str, pages: Optional[List[str]] = None) -> TalkContent:
+    """Extract text content from a PDF file with error handling, reusing page texts already extracted in `pages`."""
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            page_count = len(pdf)
+            if pages is None:
+                pages = _extract_page_texts(pdf, 0, page_count)
+            text = "\n".join(pages)
+            needs_ocr = False
+            if (page_count and len(text.strip()) < MIN_TEXT_CHARS_PER_PAGE * page_count
+                    and _text_light_pages_have_images(pdf, pages)):
+                # Too little text for the page count and images on the thin pages, so this is most
+                # likely a scanned deck rather than one of sparse title or diagram slides
+                ocr_text = _ocr_text(pdf, file_path)
+                needs_ocr = ocr_text is None
+                if ocr_text is not None and len(ocr_text) > len(text):
+                    logger.debug("Using OCR text for %s", file_path)
+                    text = ocr_text
+            metadata = pdf.get_metadata_dict(skip_empty=True)
+        finally:
+            pdf.close()
+        logger.debug("Successfully read PDF: %s", file_path)
+        logger.debug("Extracted text length: %d", len(text))
+        logger.debug("Metadata: %s", metadata)
+        # Built from PDFium's own str/dict output, so field validation is skipped
+        return TalkContent.model_construct(text=text, metadata=metadata, needs_ocr=needs_ocr)
     except Exception as e:
         logger.error(f"Error processing PDF {file_path}: {str(e)}")
-        return TalkContent(text="", metadata={})
+        return TalkContent.model_construct(text="", metadata={})
+
+def content_cache_key(file_path: str) -> str:
+    """Build the content cache key for a PDF from its path, modification time and size."""
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+def get_cached_content(cache_key: str) -> Optional[TalkContent]:
+    """Return the cached content for a key, or None on a miss or when caching is off."""
+    if content_cache is None:
+        return None
+    content_dict = content_cache.get(cache_key)
+    if content_dict is None:
+        return None
+    logger.debug("Using cached content: %s", cache_key)
+    return TalkContent.model_validate(content_dict)
+
+def cache_content(cache_key: str, content: TalkContent) -> None:
+    """Store extracted content in the cache, if caching is on."""
+    if content_cache is not None:
+        content_cache[cache_key] = content.model_dump()
+
+def _lookup_content(file_path: str) -> Tuple[str, Optional[TalkContent]]:
+    """Return the content cache key for a PDF and its cached content, if any."""
+    cache_key = content_cache_key(file_path)
+    return cache_key, get_cached_content(cache_key)
+
+def summary_cache_key(provider: str, model: str, prompt: str) -> str:
+    """Build the summary cache key for a prompt sent to a provider's model."""
+    return f"{provider}:{model}:{xxhash.xxh3_128_hexdigest(prompt.encode())}"
+
+def get_cached_summary(cache_key: str) -> Optional[Summary]:
+    """Return the cached summary for a key, or None on a miss or when caching is off."""
+    if summary_cache is None:
+        return None
+    summary_dict = summary_cache.get(cache_key)
+    if summary_dict is None:
+        return None
+    logger.info(f"Using cached summary: {cache_key}")
+    return Summary.model_validate(summary_dict)
+
+def cache_summary(cache_key: str, summary: Summary) -> None:
+    """Store a generated summary in the cache, if caching is on."""
+    if summary_cache is not None:
+        summary_cache[cache_key] = summary.model_dump()
+
+class SummaryLineParser:
+    """Sort lines of free-form generated text into Summary fields as they arrive."""
+
+    def __init__(self):
+        self.title: Optional[str] = None
+        self.main_points: List[str] = []
+        self.technical_details: List[str] = []
+        self.implications: List[str] = []
+
+    def add_line(self, line: str) -> bool:
+        """Parse one line; return True once every field is full and later lines can be skipped."""
+        if self.title is None:
+            self.title = line
+        if line.startswith('- '):
+            if len(self.main_points) < MAX_MAIN_POINTS:
+                self.main_points.append(line.strip('- '))
+        elif line.startswith('*'):
+            if len(self.technical_details) < MAX_TECHNICAL_DETAILS:
+                self.technical_details.append(line.strip('* '))
+        if len(self.implications) < MAX_IMPLICATIONS and _IMPLICATION_RE.search(line):
+            self.implications.append(line)
+        return (len(self.main_points) == MAX_MAIN_POINTS and len(self.technical_details) == MAX_TECHNICAL_DETAILS
+                and len(self.implications) == MAX_IMPLICATIONS)
+
+    def summary(self) -> Summary:
+        """Build the Summary from the lines parsed so far."""
+        # Every field is already a str or list of str, so field validation is skipped
+        return Summary.model_construct(
+            title=self.title if self.title is not None else "Untitled",
+            main_points=self.main_points,
+            technical_details=self.technical_details,
+            implications=self.implications
+        )
+
+def parse_generated_summary(generated_text: str) -> Summary:
+    """Parse free-form generated text into a Summary in a single pass over its lines."""
+    parser = SummaryLineParser()
+    for line in generated_text.split('\n'):
+        if parser.add_line(line):
+            break
+    return parser.summary()
+
+@functools.lru_cache(maxsize=None)
+def get_cohere_client(api_key: str) -> cohere.Client:
+    """Return the Cohere client for an API key, creating it on first use."""
+    return cohere.Client(api_key, httpx_client=_HTTPX_CLIENT)
+
+def split_text(text: str, size: int, overlap: int) -> List[str]:
+    """Split text into chunks of at most `size` characters, each overlapping the previous by `overlap`."""
+    step = size - overlap
+    return [text[start:start + size] for start in range(0, max(len(text) - overlap, 1), step)]
+
+def _cohere_generate(co: cohere.Client, model: str, prompt: str) -> str:
+    """Run one Cohere generation and return its text."""
+    with _request_slots:
+        response = co.generate(
+            model=model,
+            prompt=prompt,
+            max_tokens=300,
+            temperature=0.7,
+            k=0,
+            stop_sequences=[],
+            return_likelihoods='NONE'
+        )
+    return response.generations[0].text
+
+def _cohere_stream_summary(co: cohere.Client, model: str, prompt: str) -> Summary:
+    """Stream a Cohere generation into a Summary, stopping as soon as every field is full."""
+    parser = SummaryLineParser()
+    pending = ""
+    finished = False
+    with _request_slots:
+        stream = co.generate_stream(
+            model=model,
+            prompt=prompt,
+            max_tokens=300,
+            temperature=0.7,
+            k=0,
+            stop_sequences=[],
+            return_likelihoods='NONE'
+        )
+        try:
+            for event in stream:
+                if event.event_type == 'stream-error':
+                    raise RuntimeError(f"Cohere generation failed ({event.finish_reason}): {event.err}")
+                if event.event_type == 'stream-end':
+                    finished = True
+                    break
+                if event.event_type != 'text-generation':
+                    continue
+                *lines, pending = (pending + event.text).split('\n')
+                for line in lines:
+                    if parser.add_line(line):
+                        # Closing the stream drops the connection and ends the generation server-side
+                        return parser.summary()
+        finally:
+            stream.close()
+    # A partial generation must not be returned, and so cached, as if it were complete
+    if not finished:
+        raise RuntimeError("Cohere stream ended before the generation finished")
+    parser.add_line(pending)
+    return parser.summary()
 
-def get_cohere_summary(content: TalkContent, prompt_template: str) -> Summary:
+def get_cohere_summary(content: TalkContent, prompt: str) -> Summary:
     """Generate a summary using the Cohere API."""
+    model = 'command'
+    cache_key = summary_cache_key('cohere', model, prompt)
+    cached = get_cached_summary(cache_key)
+    if cached is not None:
+        return cached
+
     api_key = os.getenv('COHERE_API_KEY')
     if not api_key:
         raise ValueError("COHERE_API_KEY environment variable is not set")
 
-    co = cohere.Client(api_key)
-    prompt = prompt_template.replace("{{CONTENT}}", content.text)
+    co = get_cohere_client(api_key)
 
-    response = co.generate(
-        model='command',
-        prompt=prompt,
-        max_tokens=300,
-        temperature=0.7,
-        k=0,
-        stop_sequences=[],
-        return_likelihoods='NONE'
-    )
+    if len(prompt) > COHERE_MAX_PROMPT_CHARS:
+        # Summarize chunks of the talk in parallel, then run the full prompt over the partial summaries;
+        # each chunk request waits for a free request slot, so --concurrency still bounds what is in flight
+        chunks = split_text(content.text, COHERE_CHUNK_CHARS, COHERE_CHUNK_OVERLAP)
+        logger.info(f"Prompt too long for one Cohere call; summarizing {len(chunks)} chunks first")
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            partial_summaries = list(executor.map(
+                lambda chunk: _cohere_generate(co, model, COHERE_CHUNK_PROMPT + chunk), chunks
+            ))
+        prompt = prompt.replace(content.text, "\n\n".join(partial_summaries), 1)
 
-    # Parse the generated text into our Summary structure
-    generated_text = response.generations[0].text
-    lines = generated_text.split('\n')
-    
-    title = lines[0] if lines else "Untitled"
-    main_points = [line.strip('- ') for line in lines if line.startswith('- ')][:3]
-    technical_details = [line.strip('* ') for line in lines if line.startswith('*')][:2]
-    implications = [line for line in lines if 'implication' in line.lower()][:2]
-
-    return Summary(
-        title=title,
-        main_points=main_points,
-        technical_details=technical_details,
-        implications=implications
-    )
+    summary = _cohere_stream_summary(co, model, prompt)
+    cache_summary(cache_key, summary)
+    return summary
 
-def get_ollama_summary(content: TalkContent, prompt_template: str) -> Summary:
+def get_ollama_summary(content: TalkContent, prompt: str) -> Summary:
     """Generate a summary using the Ollama API."""
-    url = "http://localhost:11434"
-    url_generator = f"{url}/api/generate"
-    # Check if the Ollama API is running
-    if requests.get(url).status_code != 200:
-        raise ValueError("Ollama API is not running")
-    if debug_mode:
-        logger.debug(f"Ollama API is running at: {url}")
-    
+    model = "llama3.1:latest"
+    cache_key = summary_cache_key('ollama', model, prompt)
+    cached = get_cached_summary(cache_key)
+    if cached is not None:
+        return cached
+
+    url_generator = "http://localhost:11434/api/generate"
     payload = {
-        "model": "llama3.1:latest",
-        "prompt": prompt_template.replace("{{CONTENT}}", content.text),
+        "model": model,
+        "prompt": prompt,
         "stream": False
     }
-    if debug_mode:
-        logger.debug(f"Payload: {payload}")
+    if debug_mode and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload: %s", payload)
     
     try:
-        response = requests.post(url_generator, json=payload)
+        response = _SESSION.post(url_generator, json=payload, timeout=OLLAMA_TIMEOUT)
         response.raise_for_status()
-        summary_dict = json.loads(response.json()['response'])
-        logger.debug(f"Successfully generated summary: {summary_dict}")
-        return Summary(**summary_dict)
-    except (requests.RequestException, ValidationError, json.JSONDecodeError) as e:
+        # Ollama returns the generated summary as a JSON string inside its JSON envelope
+        summary_dict = orjson.loads(orjson.loads(response.content)['response'])
+        logger.debug("Successfully generated summary: %s", summary_dict)
+        summary = Summary.model_validate(summary_dict)
+        cache_summary(cache_key, summary)
+        return summary
+    except (requests.RequestException, ValidationError, orjson.JSONDecodeError) as e:
         logger.error(f"Error generating or validating summary: {str(e)}")
         return Summary(title="Error", main_points=[], technical_details=[], implications=[])
 
-def get_openai_summary(content: TalkContent, prompt_template: str) -> Summary:
+def get_openai_summary(content: TalkContent, prompt: str) -> Summary:
     """Generate a summary using the OpenAI API."""
+    model = "text-davinci-002"
+    cache_key = summary_cache_key('openai', model, prompt)
+    cached = get_cached_summary(cache_key)
+    if cached is not None:
+        return cached
+
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
 
     openai.api_key = api_key
-    prompt = prompt_template.replace("{{CONTENT}}", content.text)
 
     response = openai.Completion.create(
-        engine="text-davinci-002",
+        engine=model,
         prompt=prompt,
         max_tokens=300,
         n=1,
@@ -133,50 +432,35 @@ def get_openai_summary(content: TalkContent, prompt_template: str) -> Summary:
 
     # Parse the generated text into our Summary structure
     generated_text = response.choices[0].text.strip()
-    lines = generated_text.split('\n')
-    
-    title = lines[0] if lines else "Untitled"
-    main_points = [line.strip('- ') for line in lines if line.startswith('- ')][:3]
-    technical_details = [line.strip('* ') for line in lines if line.startswith('*')][:2]
-    implications = [line for line in lines if 'implication' in line.lower()][:2]
-
-    return Summary(
-        title=title,
-        main_points=main_points,
-        technical_details=technical_details,
-        implications=implications
-    )
+    summary = parse_generated_summary(generated_text)
+    cache_summary(cache_key, summary)
+    return summary
 
-def get_claude_summary(content: TalkContent, prompt_template: str) -> Summary:
+def get_claude_summary(content: TalkContent, prompt: str) -> Summary:
     """Generate a summary using the Anthropic Claude API."""
+    model = "claude-2"
+    cache_key = summary_cache_key('claude', model, prompt)
+    cached = get_cached_summary(cache_key)
+    if cached is not None:
+        return cached
+
     api_key = os.getenv('ANTHROPIC_API_KEY')
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
 
     anthropic = Anthropic(api_key=api_key)
-    prompt = prompt_template.replace("{{CONTENT}}", content.text)
 
     response = anthropic.completions.create(
-        model="claude-2",
+        model=model,
         prompt=f"{HUMAN_PROMPT}{prompt}{AI_PROMPT}",
         max_tokens_to_sample=300,
     )
 
     # Parse the generated text into our Summary structure
     generated_text = response.completion
-    lines = generated_text.split('\n')
-    
-    title = lines[0] if lines else "Untitled"
-    main_points = [line.strip('- ') for line in lines if line.startswith('- ')][:3]
-    technical_details = [line.strip('* ') for line in lines if line.startswith('*')][:2]
-    implications = [line for line in lines if 'implication' in line.lower()][:2]
-
-    return Summary(
-        title=title,
-        main_points=main_points,
-        technical_details=technical_details,
-        implications=implications
-    )
+    summary = parse_generated_summary(generated_text)
+    cache_summary(cache_key, summary)
+    return summary
 
 def get_summary_function(provider: str):
     """Factory function to return the appropriate summary function based on the provider."""
@@ -188,38 +472,132 @@ def get_summary_function(provider: str):
     }
     return providers.get(provider, get_cohere_summary)
 
-def process_talk_pdfs(pdf_dir: str, output_dir: str, prompt_template: str, no_summary: bool, provider: str) -> None:
-    """Process all PDF files in a directory, generate summaries, and save them."""
-    for filename in os.listdir(pdf_dir):
-        if filename.endswith('.pdf'):
-            pdf_path = os.path.join(pdf_dir, filename)
-            logger.info(f"Processing file: {pdf_path}")
-            content = read_pdf(pdf_path)
-            if debug_mode:
-                logger.debug(f"PDF content: {content}")
-
-            if content.text:
-                if no_summary:
-                    logger.info(f"Skipping summary generation for {filename} (--no-summary flag is set)")
-                    continue
+def _init_read_worker(log_level: int) -> None:
+    """Give a spawned read worker the parent's log level."""
+    logging.getLogger().setLevel(log_level)
 
-                prompt = prompt_template.replace("{{CONTENT}}", content.text) # Generated by each provider but here for debugging
-                if debug_mode: # Log just the last 40 lines of the prompt for debugging
-                    logger.debug(f"Prompt: {prompt[-40:]}")
+async def _read_content(pdf_path: str, read_executor: Executor, page_workers: int) -> TalkContent:
+    """Read one PDF on the read executor, splitting large PDFs into page blocks across `page_workers` tasks."""
+    loop = asyncio.get_running_loop()
+    pages = None
+    if page_workers > 1:
+        page_count = await loop.run_in_executor(read_executor, _pdf_page_count, pdf_path)
+        blocks = min(page_workers, page_count // MIN_PAGES_PER_WORKER)
+        if blocks > 1:
+            # Give each worker one contiguous block of pages; gather keeps them in page order
+            bounds = [page_count * i // blocks for i in range(blocks + 1)]
+            page_blocks = await asyncio.gather(*(
+                loop.run_in_executor(read_executor, _extract_page_range, pdf_path, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ))
+            pages = [text for block in page_blocks for text in block]
+    return await loop.run_in_executor(read_executor, read_pdf, pdf_path, pages)
 
-                summary = get_summary_function(provider)(content, prompt_template)
-                if debug_mode:
-                    logger.debug(f"Generated summary: {summary}")
+async def _summarize_one(pdf_path: str, output_dir: str, prompt_prefix: str, prompt_suffix: str, no_summary: bool, summarize, requests_executor: ThreadPoolExecutor, local_executor: ThreadPoolExecutor, read_executor: Executor, page_workers: int) -> None:
+    """Read one PDF, generate its summary, and save it."""
+    filename = os.path.basename(pdf_path)
+    logger.info(f"Processing file: {pdf_path}")
+    loop = asyncio.get_running_loop()
+    # The stat and cache lookups block, so they run on the local thread rather than the event loop
+    cache_key, content = await loop.run_in_executor(local_executor, _lookup_content, pdf_path)
+    if content is None:
+        content = await _read_content(pdf_path, read_executor, page_workers)
+        # Failed reads, and scanned PDFs OCR could not be run on, are not cached so they are retried
+        # on the next run, e.g. once pytesseract and the tesseract binary are installed
+        if content.text and not content.needs_ocr:
+            await loop.run_in_executor(local_executor, cache_content, cache_key, content)
+    if debug_mode and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("PDF content: %s", content)
 
-                output_filename = os.path.splitext(filename)[0] + '_summary.json'
-                output_path = os.path.join(output_dir, output_filename)
-                
-                with open(output_path, 'w') as file:
-                    json.dump(summary.dict(), file, indent=2)
-                
-                logger.info(f"Processed and saved summary for: {filename}")
-            else:
-                logger.warning(f"Skipped processing {filename} due to errors")
+    if not content.text:
+        logger.warning(f"Skipped processing {filename} due to errors")
+        return
+
+    if no_summary:
+        logger.info(f"Skipping summary generation for {filename} (--no-summary flag is set)")
+        return
+
+    if len(content.text) > MAX_INPUT_CHARS:
+        logger.warning(f"Truncating text of {filename} from {len(content.text)} to {MAX_INPUT_CHARS} characters")
+        content = content.model_copy(update={'text': content.text[:MAX_INPUT_CHARS]})
+
+    # Providers get the content that was substituted into the prompt
+    prompt = prompt_prefix + content.text + prompt_suffix
+    if debug_mode and logger.isEnabledFor(logging.DEBUG): # Log just the last 40 lines of the prompt for debugging
+        logger.debug("Prompt: %s", prompt[-40:])
+
+    # The provider clients are blocking, so each request runs in a worker thread
+    summary = await loop.run_in_executor(requests_executor, summarize, content, prompt)
+    if debug_mode:
+        logger.debug("Generated summary: %s", summary)
+
+    # Failed generations are not saved, so a summary file on disk is always a real one
+    if summary.title == "Error":
+        logger.warning(f"Not saving summary for {filename} because generation failed")
+        return
+
+    output_filename = os.path.splitext(filename)[0] + '_summary.json'
+    output_path = os.path.join(output_dir, output_filename)
+
+    with open(output_path, 'w') as file:
+        file.write(summary.model_dump_json(indent=2))
+
+    logger.info(f"Processed and saved summary for: {filename}")
+
+async def _process_talk_pdfs(pdf_paths: List[str], output_dir: str, prompt_template: str, no_summary: bool, provider: str, workers: int, concurrency: int) -> None:
+    """Summarize PDFs concurrently, with at most `concurrency` provider calls in flight."""
+    global _request_slots
+    _request_slots = threading.BoundedSemaphore(concurrency)
+    # Split the template once; each prompt is then a single concatenation
+    prompt_prefix, _, prompt_suffix = prompt_template.partition("{{CONTENT}}")
+    summarize = get_summary_function(provider)
+
+    # PDFium is not thread-safe, even across documents, so PDF reads that stay in this process share
+    # one thread; it also does the content cache I/O
+    local_executor = ThreadPoolExecutor(max_workers=1)
+    # Text extraction is CPU-bound, so with more than one worker it runs in one pool of separate
+    # processes for the whole run. Workers are spawned rather than forked because this process
+    # already has threads running.
+    if workers > 1:
+        read_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_read_worker,
+            initargs=(logging.getLogger().level,),
+        )
+    else:
+        read_executor = local_executor
+    # With fewer PDFs than workers, the pages of each PDF are split across the spare workers
+    page_workers = max(1, workers // max(1, len(pdf_paths)))
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as requests_executor:
+            # One PDF failing to read or summarize must not abort the others
+            results = await asyncio.gather(*(
+                _summarize_one(pdf_path, output_dir, prompt_prefix, prompt_suffix, no_summary, summarize, requests_executor, local_executor, read_executor, page_workers)
+                for pdf_path in pdf_paths
+            ), return_exceptions=True)
+        for pdf_path, result in zip(pdf_paths, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {pdf_path}: {str(result)}")
+    finally:
+        read_executor.shutdown()
+        local_executor.shutdown()
+
+def process_talk_pdfs(pdf_dir: str, output_dir: str, prompt_template: str, no_summary: bool, provider: str, workers: int = 1, concurrency: int = MAX_CONCURRENT_REQUESTS) -> None:
+    """Process all PDF files in a directory, generate summaries, and save them."""
+    global summary_cache, content_cache
+    with os.scandir(pdf_dir) as entries:
+        pdf_paths = [entry.path for entry in entries if entry.name.endswith('.pdf') and entry.is_file()]
+
+    summary_cache = diskcache.Cache(os.path.join(output_dir, '.summary_cache'))
+    content_cache = diskcache.Cache(os.path.join(output_dir, '.content_cache'))
+    try:
+        asyncio.run(_process_talk_pdfs(pdf_paths, output_dir, prompt_template, no_summary, provider, workers, concurrency))
+    finally:
+        summary_cache.close()
+        summary_cache = None
+        content_cache.close()
+        content_cache = None
 
 @click.command()
 @click.option('--pdf-dir', default="data/", help="Directory containing mirrored DEF CON 32 talk PDFs")
@@ -228,13 +606,20 @@ def process_talk_pdfs(pdf_dir: str, output_dir: str, prompt_template: str, no_su
 @click.option('--no-summary', is_flag=True, help="Run without generating summaries (for debugging)")
 @click.option('--debug', is_flag=True, help="Run without generating summaries (for debugging)")
 @click.option('--provider', default='cohere', type=click.Choice(['cohere', 'ollama', 'openai', 'claude']), help="AI provider to use for summarization")
-def main(pdf_dir: str, template_path: str, output_dir: str, no_summary: bool, debug: bool, provider: str):
+@click.option('--workers', default=os.cpu_count(), type=click.IntRange(min=1), show_default=True, help="Number of processes used to extract text from PDFs")
+@click.option('--concurrency', default=MAX_CONCURRENT_REQUESTS, type=click.IntRange(min=1), show_default=True, help="Maximum number of summary requests in flight at once")
+@click.option('--verbose', is_flag=True, help="Enable debug logging")
+def main(pdf_dir: str, template_path: str, output_dir: str, no_summary: bool, debug: bool, provider: str, workers: int, concurrency: int, verbose: bool):
     """Process DEF CON 32 talk PDFs and generate summaries."""
+    # Debug mode logs intermediate data at DEBUG level, so it implies verbose logging
+    if verbose or debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
     logger.info("Starting PDF processing" + (" (Debug mode: No summaries will be generated)" if no_summary else ""))
     
-    logger.debug(f"PDF directory: {os.path.abspath(pdf_dir)}")
-    logger.debug(f"Template path: {os.path.abspath(template_path)}")
-    logger.debug(f"Output directory: {os.path.abspath(output_dir)}")
+    logger.debug("PDF directory: %s", os.path.abspath(pdf_dir))
+    logger.debug("Template path: %s", os.path.abspath(template_path))
+    logger.debug("Output directory: %s", os.path.abspath(output_dir))
 
     if debug:
         logger.info("Debug mode enabled")
@@ -252,10 +637,10 @@ def main(pdf_dir: str, template_path: str, output_dir: str, no_summary: bool, de
         return
     
     prompt_template = read_template(template_path)
-    logger.debug(f"Prompt template length: {len(prompt_template)}")
+    logger.debug("Prompt template length: %d", len(prompt_template))
     if debug_mode:
-        logger.debug(f"Prompt template: {prompt_template}")
-    process_talk_pdfs(pdf_dir, output_dir, prompt_template, no_summary, provider)
+        logger.debug("Prompt template: %s", prompt_template)
+    process_talk_pdfs(pdf_dir, output_dir, prompt_template, no_summary, provider, workers, concurrency)
     
     if not no_summary:
         logger.info(f"All summaries have been saved to: {output_dir}")
@@ -0,0 +1,38 @@
+# test_mirror_media_server.py
+
+import unittest
+import tempfile
+import os
+from unittest.mock import patch
+from defcon_mirror_media_server import _process_one, PostProcessingOptions
+
+MARKDOWN = "# Attacking the *Stack*\n\nSee [the slides](https://media.defcon.org/slides.pdf) and `gdb`\\.\n"
+
+class TestPostProcessing(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def process(self, name, opts):
+        # Run _process_one on an empty placeholder PDF and return the generated text
+        pdf_path = os.path.join(self.temp_dir.name, f"{name}.pdf")
+        open(pdf_path, 'wb').close()
+        _process_one(pdf_path, 0, opts)
+        with open(os.path.join(self.temp_dir.name, f"{name}.txt"), encoding='utf-8') as f:
+            return f.read()
+
+    @patch('defcon_mirror_media_server.pypandoc.convert_file', return_value=MARKDOWN)
+    def test_text_same_with_and_without_markdown(self, mock_convert_file):
+        # Test that the text output does not depend on whether Markdown is also generated
+        text_only = self.process('text_only', PostProcessingOptions(to_text=True))
+        with_markdown = self.process('with_markdown', PostProcessingOptions(to_text=True, to_markdown=True))
+
+        self.assertEqual(text_only, with_markdown)
+        self.assertEqual(text_only, "Attacking the Stack\n\nSee the slides and gdb.\n")
+        self.assertEqual(mock_convert_file.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
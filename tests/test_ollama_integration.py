@@ -1,17 +1,21 @@
 # test_ollama_integration.py
 
 import unittest
+import tempfile
 from unittest.mock import patch, MagicMock
+import diskcache
+import orjson
+from src import summarizer
 from src.summarizer import get_ollama_summary, TalkContent, Summary
 
 class TestOllamaIntegration(unittest.TestCase):
 
-    @patch('src.summarizer.requests.post')
+    @patch('src.summarizer._SESSION.post')
     def test_successful_api_call(self, mock_post):
         # Test a successful API call to Ollama
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'response': '{"title": "Test Title", "main_points": ["Point 1"], "technical_details": ["Detail 1"], "implications": ["Implication 1"]}'}
+        mock_response.content = orjson.dumps({'response': '{"title": "Test Title", "main_points": ["Point 1"], "technical_details": ["Detail 1"], "implications": ["Implication 1"]}'})
         mock_post.return_value = mock_response
 
         content = TalkContent(text="Test content", metadata={})
@@ -20,19 +24,30 @@ class TestOllamaIntegration(unittest.TestCase):
         self.assertIsInstance(result, Summary)
         self.assertEqual(result.title, "Test Title")
 
+    @patch('src.summarizer._SESSION.post')
+    def test_read_timeout_is_unbounded(self, mock_post):
+        # Test that only connecting is time-limited, as local generation can take minutes
+        mock_post.return_value.content = orjson.dumps({'response': '{"title": "Test Title", "main_points": [], "technical_details": [], "implications": []}'})
+
+        get_ollama_summary(TalkContent(text="Test content", metadata={}), "Test prompt")
+
+        connect_timeout, read_timeout = mock_post.call_args.kwargs['timeout']
+        self.assertGreater(connect_timeout, 0)
+        self.assertIsNone(read_timeout)
+
     def test_api_error_handling(self):
         # Test error handling for API calls
-        with patch('src.summarizer.requests.post', side_effect=Exception("API Error")):
+        with patch('src.summarizer._SESSION.post', side_effect=Exception("API Error")):
             content = TalkContent(text="Test content", metadata={})
             with self.assertRaises(Exception):
                 get_ollama_summary(content, "Test prompt")
 
     def test_invalid_response_handling(self):
         # Test handling of invalid API responses
-        with patch('src.summarizer.requests.post') as mock_post:
+        with patch('src.summarizer._SESSION.post') as mock_post:
             mock_response = MagicMock()
             mock_response.status_code = 200
-            mock_response.json.return_value = {'response': 'Invalid JSON'}
+            mock_response.content = orjson.dumps({'response': 'Invalid JSON'})
             mock_post.return_value = mock_response
 
             content = TalkContent(text="Test content", metadata={})
@@ -40,3 +55,17 @@ class TestOllamaIntegration(unittest.TestCase):
 
             self.assertEqual(result.title, "Error")
 
+    @patch('src.summarizer._SESSION.post')
+    def test_cached_summary_skips_api_call(self, mock_post):
+        # Test that a repeated prompt is answered from the summary cache
+        mock_post.return_value.content = orjson.dumps({'response': '{"title": "Test Title", "main_points": [], "technical_details": [], "implications": []}'})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch.object(summarizer, 'summary_cache', diskcache.Cache(cache_dir)) as cache:
+                content = TalkContent(text="Test content", metadata={})
+                first = get_ollama_summary(content, "Test prompt")
+                second = get_ollama_summary(content, "Test prompt")
+                cache.close()
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(first, second)
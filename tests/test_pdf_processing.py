@@ -3,10 +3,46 @@
 import unittest
 import tempfile
 import os
+from unittest.mock import MagicMock, patch
 from src.summarizer import read_pdf, TalkContent
 
+def make_pdf(page_texts, title="Test Talk", scanned=False):
+    """Build a minimal PDF with one line of Helvetica text per page, drawn over a full-page image if scanned."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    resources = "/Font << /F1 3 0 R >>"
+    image = ""
+    if scanned:
+        objects.append("<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8 /Length 1 >>\nstream\nA\nendstream")
+        resources += f" /XObject << /Im1 {len(objects)} 0 R >>"
+        image = "q 612 0 0 792 0 0 cm /Im1 Do Q "
+    kids = []
+    for text in page_texts:
+        stream = f"{image}BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << {resources} >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    objects.append(f"<< /Title ({title}) >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {len(objects)} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return pdf
+
 class TestPDFProcessing(unittest.TestCase):
 
+    def setUp(self):
+        # The sample PDFs have short text layers, so keep OCR out of the way unless a test enables it
+        patcher = patch('src.summarizer.pytesseract', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_valid_pdf_reading(self):
         # Test reading a valid PDF file
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
@@ -19,6 +55,56 @@ class TestPDFProcessing(unittest.TestCase):
         self.assertIsInstance(result, TalkContent)
         self.assertIn("Test PDF content", result.text)
 
+    def test_multipage_text_joined_in_order(self):
+        # Test that page texts are joined with newlines in page order
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
+            temp_pdf.write(make_pdf(["First page", "Second page", "Third page"]))
+            temp_pdf.flush()
+
+            result = read_pdf(temp_pdf.name)
+            os.unlink(temp_pdf.name)
+
+        self.assertEqual(result.text.split("\n"), ["First page", "Second page", "Third page"])
+
+    def test_pages_extracted_elsewhere_are_reused(self):
+        # Test that page texts passed in are joined instead of being extracted again
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
+            temp_pdf.write(make_pdf(["First page", "Second page"]))
+            temp_pdf.flush()
+
+            result = read_pdf(temp_pdf.name, pages=["Page one from a worker", "Page two from a worker"])
+            os.unlink(temp_pdf.name)
+
+        self.assertEqual(result.text, "Page one from a worker\nPage two from a worker")
+        self.assertEqual(result.metadata, {'Title': 'Test Talk'})
+
+    @patch('src.summarizer.pytesseract')
+    def test_scanned_pdf_falls_back_to_ocr(self, mock_pytesseract):
+        # Test that PDFs with too little text per page are OCRed
+        mock_pytesseract.image_to_string.side_effect = ["Slide one as OCR text\n\f", "Slide two as OCR text\n\f"]
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
+            temp_pdf.write(make_pdf(["", ""], scanned=True))
+            temp_pdf.flush()
+
+            result = read_pdf(temp_pdf.name)
+            os.unlink(temp_pdf.name)
+
+        self.assertEqual(mock_pytesseract.image_to_string.call_count, 2)
+        self.assertEqual(result.text, "Slide one as OCR text\nSlide two as OCR text")
+
+    @patch('src.summarizer.pytesseract')
+    def test_sparse_text_pdf_without_images_not_ocred(self, mock_pytesseract):
+        # Test that a deck of short title slides is not mistaken for a scanned one
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
+            temp_pdf.write(make_pdf(["Title slide", "Diagram"]))
+            temp_pdf.flush()
+
+            result = read_pdf(temp_pdf.name)
+            os.unlink(temp_pdf.name)
+
+        mock_pytesseract.image_to_string.assert_not_called()
+        self.assertEqual(result.text, "Title slide\nDiagram")
+
     def test_invalid_pdf_handling(self):
         # Test handling of invalid PDF files
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
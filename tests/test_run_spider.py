@@ -0,0 +1,69 @@
+# test_run_spider.py
+
+import unittest
+import tempfile
+import os
+from unittest.mock import MagicMock
+from scrapy.http import Request, Response
+from scrapy.utils.test import get_crawler
+from run_spider import DefConConfig, DefConSpider, DefConFilesPipeline
+
+class TestDefConFilesPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = self.temp_dir.name
+        self.spider = DefConSpider(DefConConfig(output_dir=self.output_dir))
+        self.pipeline = DefConFilesPipeline.from_crawler(get_crawler(settings_dict={'FILES_STORE': self.output_dir}))
+        self.info = MagicMock(spider=self.spider)
+
+    def tearDown(self):
+        self.spider.closed('finished')
+        self.temp_dir.cleanup()
+
+    def download(self, url, body, seen_key=None):
+        # Run a downloaded file through the pipeline the way FilesPipeline.media_downloaded does
+        item = {'file_urls': [url], 'event_name': 'DEF CON 32', 'seen_key': seen_key}
+        request = Request(url)
+        response = Response(url, body=body, request=request)
+        file_info = {
+            'url': url,
+            'path': self.pipeline.file_path(request, response=response, info=self.info, item=item),
+            'checksum': self.pipeline.file_downloaded(response, request, self.info, item=item),
+            'status': 'downloaded',
+        }
+        return self.pipeline.item_completed([(True, file_info)], item, self.info)
+
+    def test_duplicate_content_points_at_stored_copy(self):
+        # Test that a duplicate is not saved and its result path is that of the stored file
+        self.download('https://media.defcon.org/DEF CON 32/talk.pdf', b'%PDF-1.4 slides')
+        item = self.download('https://media.defcon.org/DEF CON 32/talk-copy.pdf', b'%PDF-1.4 slides')
+
+        self.assertEqual(item['files'][0]['path'], os.path.join('DEF CON 32', 'talk.pdf'))
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, 'DEF CON 32')), ['talk.pdf'])
+
+    def test_uptodate_file_recorded_as_seen(self):
+        # Test that a file already in the store is recorded, so later runs skip its download
+        seen_key = 'url:https://media.defcon.org/DEF CON 32/talk.pdf:15:'
+        item = {'file_urls': ['https://media.defcon.org/DEF CON 32/talk.pdf'], 'event_name': 'DEF CON 32', 'seen_key': seen_key}
+        file_info = {
+            'url': item['file_urls'][0],
+            'path': os.path.join('DEF CON 32', 'talk.pdf'),
+            'checksum': 'd41d8cd98f00b204e9800998ecf8427e',
+            'status': 'uptodate',
+        }
+
+        item = self.pipeline.item_completed([(True, file_info)], item, self.info)
+
+        self.assertIn(seen_key, self.spider.seen)
+        self.assertEqual(item['files'], [file_info])
+
+    def test_downloaded_file_recorded_as_seen(self):
+        # Test that a newly downloaded file is recorded under its HEAD response key
+        seen_key = 'url:https://media.defcon.org/DEF CON 32/talk.pdf:15:'
+        self.download('https://media.defcon.org/DEF CON 32/talk.pdf', b'%PDF-1.4 slides', seen_key=seen_key)
+
+        self.assertIn(seen_key, self.spider.seen)
+
+if __name__ == '__main__':
+    unittest.main()
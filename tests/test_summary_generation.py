@@ -1,11 +1,40 @@
 # test_summary_generation.py
 
 import unittest
-from src.summarizer import process_talk_pdfs, TalkContent, Summary
-from unittest.mock import patch, mock_open
+import tempfile
+import os
+import threading
+import time
+from src.summarizer import get_cohere_summary, process_talk_pdfs, read_pdf, parse_generated_summary, split_text, TalkContent, Summary
+from unittest.mock import MagicMock, patch
+from tests.test_pdf_processing import make_pdf
+
+try:
+    from pytesseract import TesseractNotFoundError
+except ImportError:  # pytesseract is optional; stand in for the error it raises when the binary is missing
+    class TesseractNotFoundError(OSError):
+        pass
+
+def stream_events(*texts):
+    """Yield Cohere text-generation stream events for each piece of text, then a stream-end event."""
+    for text in texts:
+        yield MagicMock(event_type='text-generation', text=text)
+    yield MagicMock(event_type='stream-end')
 
 class TestSummaryGeneration(unittest.TestCase):
 
+    def setUp(self):
+        pdf_dir = tempfile.TemporaryDirectory()
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(pdf_dir.cleanup)
+        self.addCleanup(output_dir.cleanup)
+        self.pdf_dir = pdf_dir.name
+        self.output_dir = output_dir.name
+
+    def create_pdfs(self, *filenames):
+        for filename in filenames:
+            open(os.path.join(self.pdf_dir, filename), 'wb').close()
+
     @patch('src.summarizer.read_pdf')
     @patch('src.summarizer.get_ollama_summary')
     def test_process_talk_pdfs(self, mock_get_summary, mock_read_pdf):
@@ -17,18 +46,89 @@ class TestSummaryGeneration(unittest.TestCase):
             technical_details=["Detail 1"],
             implications=["Implication 1"]
         )
+        self.create_pdfs('test1.pdf', 'test2.pdf', 'notes.txt')
 
-        with patch('os.listdir', return_value=['test1.pdf', 'test2.pdf']):
-            with patch('builtins.open', mock_open()) as mock_file:
-                process_talk_pdfs("/fake/path", "/fake/output", "Test prompt")
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama')
 
         self.assertEqual(mock_read_pdf.call_count, 2)
         self.assertEqual(mock_get_summary.call_count, 2)
+        summaries = sorted(f for f in os.listdir(self.output_dir) if f.endswith('.json'))
+        self.assertEqual(summaries, ['test1_summary.json', 'test2_summary.json'])
+
+    @patch('src.summarizer.get_ollama_summary')
+    def test_process_talk_pdfs_with_worker_processes(self, mock_get_summary):
+        # Test that PDFs read in worker processes are summarized and saved
+        mock_get_summary.return_value = Summary(
+            title="Test Title",
+            main_points=["Point 1"],
+            technical_details=["Detail 1"],
+            implications=["Implication 1"]
+        )
+        for filename in ('test1.pdf', 'test2.pdf'):
+            with open(os.path.join(self.pdf_dir, filename), 'wb') as file:
+                file.write(make_pdf([filename]))
+
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama', workers=2)
+
+        texts = sorted(call.args[0].text for call in mock_get_summary.call_args_list)
+        self.assertEqual(texts, ['test1.pdf', 'test2.pdf'])
+        summaries = sorted(f for f in os.listdir(self.output_dir) if f.endswith('.json'))
+        self.assertEqual(summaries, ['test1_summary.json', 'test2_summary.json'])
+
+    @patch('src.summarizer.MIN_PAGES_PER_WORKER', 2)
+    @patch('src.summarizer.get_ollama_summary')
+    def test_pages_split_across_worker_processes(self, mock_get_summary):
+        # Test that a PDF's pages extracted in separate worker processes are joined in page order
+        mock_get_summary.return_value = Summary(title="Test Title", main_points=[], technical_details=[], implications=[])
+        page_texts = [f"Page {i}" for i in range(7)]
+        with open(os.path.join(self.pdf_dir, 'test1.pdf'), 'wb') as file:
+            file.write(make_pdf(page_texts))
+
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama', workers=3)
+
+        self.assertEqual(mock_get_summary.call_args.args[0].text.split("\n"), page_texts)
+
+    @patch('src.summarizer.read_pdf', wraps=read_pdf)
+    def test_unchanged_pdf_read_once_across_runs(self, mock_read_pdf):
+        # Test that extracted content is reused on a rerun until the PDF changes
+        pdf_path = os.path.join(self.pdf_dir, 'test1.pdf')
+        with open(pdf_path, 'wb') as file:
+            file.write(make_pdf(["Test content"]))
+
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        self.assertEqual(mock_read_pdf.call_count, 1)
+
+        with open(pdf_path, 'wb') as file:
+            file.write(make_pdf(["Changed test content"]))
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        self.assertEqual(mock_read_pdf.call_count, 2)
+
+    @patch('src.summarizer.read_pdf', wraps=read_pdf)
+    def test_pdf_needing_ocr_reread_until_ocr_runs(self, mock_read_pdf):
+        # Test that text-layer-only content of a scanned PDF is not cached while OCR cannot run
+        with open(os.path.join(self.pdf_dir, 'test1.pdf'), 'wb') as file:
+            file.write(make_pdf(["Title slide"], scanned=True))
+        missing_binary = MagicMock(TesseractError=RuntimeError)
+        missing_binary.image_to_string.side_effect = TesseractNotFoundError()
+        working = MagicMock(TesseractError=RuntimeError)
+        working.image_to_string.return_value = "Title slide and the rest of the scanned page"
+
+        with patch('src.summarizer.pytesseract', None):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        with patch('src.summarizer.pytesseract', missing_binary):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        self.assertEqual(mock_read_pdf.call_count, 3)
+
+        with patch('src.summarizer.pytesseract', working):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", True, 'ollama')
+        self.assertEqual(mock_read_pdf.call_count, 4)
 
     def test_empty_directory_handling(self):
         # Test handling of an empty directory
-        with patch('os.listdir', return_value=[]):
-            result = process_talk_pdfs("/fake/path", "/fake/output", "Test prompt")
+        result = process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama')
         self.assertIsNone(result)
 
     @patch('src.summarizer.read_pdf')
@@ -42,14 +142,172 @@ class TestSummaryGeneration(unittest.TestCase):
             technical_details=[],
             implications=[]
         )
+        self.create_pdfs('test1.pdf')
 
-        with patch('os.listdir', return_value=['test1.pdf']):
-            with patch('builtins.open', mock_open()) as mock_file:
-                process_talk_pdfs("/fake/path", "/fake/output", "Test prompt")
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama')
 
         self.assertEqual(mock_get_summary.call_count, 0)
 
-    def test_prompt_template_usage(self):
-        # Test correct usage of the prompt template
-        # This would involve mocking the template reading and verifying its content in the API call
-        pass
+    @patch('src.summarizer.MAX_INPUT_CHARS', 4)
+    @patch('src.summarizer.read_pdf')
+    @patch('src.summarizer.get_ollama_summary')
+    def test_long_content_truncated_in_prompt(self, mock_get_summary, mock_read_pdf):
+        # Test that PDF text beyond MAX_INPUT_CHARS is left out of the prompt
+        mock_read_pdf.return_value = TalkContent(text="Test content", metadata={})
+        mock_get_summary.return_value = Summary(title="Test Title", main_points=[], technical_details=[], implications=[])
+        self.create_pdfs('test1.pdf')
+
+        with self.assertLogs('src.summarizer', level='WARNING'):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "{{CONTENT}}!", False, 'ollama')
+
+        mock_get_summary.assert_called_once_with(TalkContent(text="Test", metadata={}), "Test!")
+
+    @patch('src.summarizer.read_pdf')
+    @patch('src.summarizer.get_ollama_summary')
+    def test_error_in_one_pdf_does_not_stop_others(self, mock_get_summary, mock_read_pdf):
+        # Test that the other PDFs are still summarized when one of them fails
+        def read(pdf_path, pages=None):
+            if pdf_path.endswith('test1.pdf'):
+                raise Exception("PDF Error")
+            return TalkContent(text="Test content", metadata={})
+        mock_read_pdf.side_effect = read
+        mock_get_summary.return_value = Summary(title="Test Title", main_points=[], technical_details=[], implications=[])
+        self.create_pdfs('test1.pdf', 'test2.pdf')
+
+        with self.assertLogs('src.summarizer', level='ERROR'):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama')
+
+        summaries = [f for f in os.listdir(self.output_dir) if f.endswith('.json')]
+        self.assertEqual(summaries, ['test2_summary.json'])
+
+    @patch('src.summarizer.read_pdf')
+    @patch('src.summarizer.get_ollama_summary')
+    def test_failed_summary_not_saved(self, mock_get_summary, mock_read_pdf):
+        # Test that no summary file is written when generation fails
+        mock_read_pdf.return_value = TalkContent(text="Test content", metadata={})
+        mock_get_summary.return_value = Summary(title="Error", main_points=[], technical_details=[], implications=[])
+        self.create_pdfs('test1.pdf')
+
+        with self.assertLogs('src.summarizer', level='WARNING'):
+            process_talk_pdfs(self.pdf_dir, self.output_dir, "Test prompt", False, 'ollama')
+
+        summaries = [f for f in os.listdir(self.output_dir) if f.endswith('.json')]
+        self.assertEqual(summaries, [])
+
+    @patch('src.summarizer.read_pdf')
+    @patch('src.summarizer.get_ollama_summary')
+    def test_prompt_template_usage(self, mock_get_summary, mock_read_pdf):
+        # Test that the PDF text is substituted for the template placeholder
+        mock_read_pdf.return_value = TalkContent(text="Test content", metadata={})
+        mock_get_summary.return_value = Summary(title="Test Title", main_points=[], technical_details=[], implications=[])
+        self.create_pdfs('test1.pdf')
+
+        process_talk_pdfs(self.pdf_dir, self.output_dir, "Summarize:\n{{CONTENT}}\nEnd.", False, 'ollama')
+
+        mock_get_summary.assert_called_once_with(mock_read_pdf.return_value, "Summarize:\nTest content\nEnd.")
+
+    def test_parse_generated_summary(self):
+        # Test that generated text lines are sorted into the summary fields
+        generated_text = "\n".join([
+            "Talk Title",
+            "- Point 1",
+            "* Detail 1",
+            "- Point 2 has an Implication",
+            "- Point 3",
+            "- Point 4",
+            "** Detail 2",
+            "* Detail 3",
+            "Implication 1",
+            "Implication 2",
+        ])
+
+        summary = parse_generated_summary(generated_text)
+
+        self.assertEqual(summary.title, "Talk Title")
+        self.assertEqual(summary.main_points, ["Point 1", "Point 2 has an Implication", "Point 3"])
+        self.assertEqual(summary.technical_details, ["Detail 1", "Detail 2"])
+        self.assertEqual(summary.implications, ["- Point 2 has an Implication", "Implication 1"])
+
+    def test_split_text_overlaps_chunks(self):
+        # Test that chunks overlap and together cover the whole text
+        text = "abcdefghij"
+        self.assertEqual(split_text(text, 4, 1), ["abcd", "defg", "ghij"])
+        self.assertEqual(split_text("abc", 4, 1), ["abc"])
+
+    @patch.dict(os.environ, {'COHERE_API_KEY': 'test-key'})
+    @patch('src.summarizer.COHERE_MAX_PROMPT_CHARS', 20)
+    @patch('src.summarizer.COHERE_CHUNK_CHARS', 10)
+    @patch('src.summarizer.COHERE_CHUNK_OVERLAP', 2)
+    @patch('src.summarizer.get_cohere_client')
+    def test_long_cohere_prompt_summarized_in_chunks(self, mock_get_client):
+        # Test that an over-long prompt is reduced to partial summaries before the final call
+        mock_client = mock_get_client.return_value
+        mock_client.generate.return_value = MagicMock(generations=[MagicMock(text="partial")])
+        mock_client.generate_stream.return_value = stream_events("Talk Title\n- Point 1")
+        content = TalkContent(text="0123456789abcdefghij", metadata={})
+
+        summary = get_cohere_summary(content, "Summarize: " + content.text)
+
+        self.assertEqual(mock_client.generate.call_count, 3)
+        self.assertEqual(mock_client.generate_stream.call_args.kwargs['prompt'], "Summarize: partial\n\npartial\n\npartial")
+        self.assertEqual(summary.title, "Talk Title")
+        self.assertEqual(summary.main_points, ["Point 1"])
+
+    @patch.dict(os.environ, {'COHERE_API_KEY': 'test-key'})
+    @patch('src.summarizer.COHERE_MAX_PROMPT_CHARS', 20)
+    @patch('src.summarizer.COHERE_CHUNK_CHARS', 10)
+    @patch('src.summarizer.COHERE_CHUNK_OVERLAP', 2)
+    @patch('src.summarizer._request_slots', threading.BoundedSemaphore(1))
+    @patch('src.summarizer.get_cohere_client')
+    def test_cohere_chunk_requests_share_request_slots(self, mock_get_client):
+        # Test that chunk requests never exceed the configured number of requests in flight
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        def generate(**kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return MagicMock(generations=[MagicMock(text="partial")])
+        mock_client = mock_get_client.return_value
+        mock_client.generate.side_effect = generate
+        mock_client.generate_stream.return_value = stream_events("Talk Title")
+        content = TalkContent(text="0123456789abcdefghij", metadata={})
+
+        get_cohere_summary(content, "Summarize: " + content.text)
+
+        self.assertEqual(mock_client.generate.call_count, 3)
+        self.assertEqual(peak[0], 1)
+
+    @patch.dict(os.environ, {'COHERE_API_KEY': 'test-key'})
+    @patch('src.summarizer.get_cohere_client')
+    def test_cohere_stream_stops_once_summary_is_full(self, mock_get_client):
+        # Test that the stream is abandoned as soon as every summary field is full
+        def stream():
+            yield from list(stream_events("Title\n- P1\n- P2", "\n- P3\n* D1\n* D2\nImplication 1\nImplication 2\n"))[:2]
+            self.fail("Stream read after every summary field was full")
+        mock_get_client.return_value.generate_stream.return_value = stream()
+
+        summary = get_cohere_summary(TalkContent(text="Test content", metadata={}), "Test prompt")
+
+        self.assertEqual(summary.title, "Title")
+        self.assertEqual(summary.main_points, ["P1", "P2", "P3"])
+        self.assertEqual(summary.technical_details, ["D1", "D2"])
+        self.assertEqual(summary.implications, ["Implication 1", "Implication 2"])
+
+    @patch.dict(os.environ, {'COHERE_API_KEY': 'test-key'})
+    @patch('src.summarizer.get_cohere_client')
+    def test_cohere_stream_error_raises_without_caching(self, mock_get_client):
+        # Test that a generation failing mid-stream is an error rather than a cached partial summary
+        def stream():
+            yield from list(stream_events("Title\n- P1"))[:1]
+            yield MagicMock(event_type='stream-error', finish_reason='ERROR', err="Internal error")
+        mock_get_client.return_value.generate_stream.return_value = stream()
+
+        cache = {}
+        with patch('src.summarizer.summary_cache', cache), self.assertRaises(RuntimeError):
+            get_cohere_summary(TalkContent(text="Test content", metadata={}), "Test prompt")
+
+        self.assertEqual(cache, {})